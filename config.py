@@ -8,7 +8,46 @@ BAUDRATE = 9600
 
 # Potikoiden roolit: laita "volume" jos haluat näyttää/ohjata ääntä,
 # tai "none" jos et käytä. Yksi potikka -> yksi entry.
-POT_MODES = ["volume"]  # vaihtoehto: ["none"]
+# Suhteelliset tilat muuttavat kierron askeliksi:
+#   "scroll" = hiiren rulla, "arrows" = nuoli ylös/alas,
+#   "zoom" = ctrl + plus/miinus, "scrub" = nuoli vasen/oikea (aikajana)
+POT_MODES = ["volume"]  # vaihtoehto: ["none"], ["scroll"], ...
+
+# Worker lukee aina kaiken odottavan kerralla. 9600 baudilla frame (~17 tavua)
+# kestää ~18 ms, joten 2–3 framea yhdellä lukukerralla on tavallista
+# ajoitusvaihtelua. Vasta tämän verran frameja (~70 ms jäljessä, esim. GC-tauko
+# tai hidas volume-kutsu) lasketaan metrics["catchups"]-mittariin.
+CATCHUP_FRAMES = 4
+
+# Suhteellisten tilojen säädöt
+POT_COUNTS_PER_STEP = 16       # ADC-lukemaa (0–1023) per askel hitaalla kierrolla
+POT_DEADBAND = 3               # tätä pienempi muutos on kohinaa
+POT_TICK_MS = 15               # ajastimen jakso, askeleet lähetetään tässä tahdissa
+# Ylärajat per jakso, ettei OS:n syötejono tulvi. Näppäintiloissa jokainen askel
+# on painallus+vapautus (3 / 15 ms = enintään 200 näppäintä/s); scroll on yksi
+# scroll()-kutsu per jakso, joten sen katto voi olla paljon suurempi.
+POT_MAX_STEPS_PER_TICK = 3     # arrows / zoom / scrub
+POT_MAX_SCROLL_PER_TICK = 64   # scroll
+# Kuinka kauan näppäintilat saavat vielä purkaa kertymää nupin pysähdyttyä.
+# Kertymän katto = POT_MAX_STEPS_PER_TICK * POT_KEY_TAIL_MS / POT_TICK_MS
+# (oletuksilla 50 askelta → enintään 250 ms).
+POT_KEY_TAIL_MS = 250
+
+# Kiihdytys: curve = "none" | "linear" | "power"
+# kerroin = 1 + (nopeus/ref_rate)^exponent, enintään max_gain
+# Scrollin kertymän katto on yksi koko kierros täydellä kertoimella
+# (1024 / POT_COUNTS_PER_STEP * max_gain askelta), joten käyrää ei leikata.
+# Näppäintiloilla katto tulee POT_KEY_TAIL_MS:stä.
+POT_ACCEL = {"curve": "power", "ref_rate": 400.0, "exponent": 1.5, "max_gain": 6.0}
+
+# Sovellusprofiilit: kuinka usein etualan ikkunaa pollataan (ms).
+# Profiilit ovat settings.jsonissa: "profiles": {"obs64.exe": [...], ...}
+FOREGROUND_POLL_MS = 300
+
+# Käyttöloki: rengaspuskuri tiedostossa (mmap), 24 tavua per tapahtuma.
+# 1 MiB ≈ 43 000 tapahtumaa. 0 = pois päältä. Yhteenveto: python usagelog.py
+USAGE_LOG_FILE = Path("usage.log")
+USAGE_LOG_SIZE = 1 << 20
 
 # Näppäinyhdistelmien erotin UI:ssa (esim. "ctrl+shift+f5")
 KEY_COMBO_SEPARATOR = "+"
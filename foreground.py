@@ -0,0 +1,199 @@
+# foreground.py
+
+import os, sys
+from PyQt5 import QtCore
+from config import FOREGROUND_POLL_MS
+
+# (pid, käynnistysaika) → profiili -välimuistin maksimikoko (tyhjennetään kun täyttyy)
+_CACHE_MAX = 256
+
+
+class ForegroundProvider:
+    """
+    Rajapinta etualalla olevan ikkunan tiedoille.
+    foreground_pid() kutsutaan joka pollauksella, joten sen pitää olla halpa.
+    process_key() kutsutaan vain kun etualan pid vaihtuu: se yksilöi prosessin
+    (pid + käynnistysaika), koska Windows kierrättää pid:t nopeasti.
+    process_name() voi olla kallis, watcher välimuistittaa sen tuloksen.
+    """
+
+    def foreground_pid(self) -> int:
+        raise NotImplementedError
+
+    def process_key(self, pid: int):
+        return pid
+
+    def process_name(self, pid: int) -> str:
+        raise NotImplementedError
+
+
+class NullForegroundProvider(ForegroundProvider):
+    """Käytetään alustoilla, joille ei ole toteutusta → aina oletusprofiili."""
+
+    def foreground_pid(self) -> int:
+        return 0
+
+    def process_name(self, pid: int) -> str:
+        return ""
+
+
+class FakeForegroundProvider(ForegroundProvider):
+    """Testeihin (esim. Linuxilla): etualan prosessi asetetaan käsin."""
+
+    def __init__(self, processes=None):
+        self.processes = dict(processes or {})  # pid → nimi
+        self.starts = dict.fromkeys(self.processes, 0)  # pid → "käynnistysaika"
+        self.pid = 0
+        self.name_lookups = 0
+
+    def focus(self, pid: int):
+        self.pid = pid
+
+    def spawn(self, pid: int, name: str):
+        """Uusi prosessi (mahdollisesti kierrätetyllä pid:llä)."""
+        self.processes[pid] = name
+        self.starts[pid] = self.starts.get(pid, -1) + 1
+
+    def foreground_pid(self) -> int:
+        return self.pid
+
+    def process_key(self, pid: int):
+        return pid, self.starts.get(pid, 0)
+
+    def process_name(self, pid: int) -> str:
+        self.name_lookups += 1
+        return self.processes.get(pid, "")
+
+
+class WindowsForegroundProvider(ForegroundProvider):
+    """GetForegroundWindow + QueryFullProcessImageNameW (ctypes, ei lisäriippuvuuksia)."""
+
+    _PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+
+        # omat WinDLL-instanssit: prototyypit eivät vuoda muiden kirjastojen
+        # (pynput, comtypes) käyttämään ctypes.windll-jaettuun tilaan.
+        # HWND/HANDLE ovat 64-bittisiä → restype pitää asettaa, muuten ctypes
+        # katkaisee ne C int -kokoon.
+        user32 = ctypes.WinDLL("user32", use_last_error=True)
+        user32.GetForegroundWindow.argtypes = []
+        user32.GetForegroundWindow.restype = wintypes.HWND
+        user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+        user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.QueryFullProcessImageNameW.argtypes = [
+            wintypes.HANDLE, wintypes.DWORD, wintypes.LPWSTR, ctypes.POINTER(wintypes.DWORD)]
+        kernel32.QueryFullProcessImageNameW.restype = wintypes.BOOL
+        kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        kernel32.CloseHandle.restype = wintypes.BOOL
+        kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+        kernel32.GetProcessTimes.restype = wintypes.BOOL
+
+        self._user32 = user32
+        self._kernel32 = kernel32
+        self._pid = wintypes.DWORD()
+
+    def foreground_pid(self) -> int:
+        hwnd = self._user32.GetForegroundWindow()
+        if not hwnd:
+            return 0
+        self._user32.GetWindowThreadProcessId(hwnd, self._ctypes.byref(self._pid))
+        return self._pid.value
+
+    def process_key(self, pid: int):
+        h = self._kernel32.OpenProcess(self._PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not h:
+            return pid
+        try:
+            times = [self._wintypes.FILETIME() for _ in range(4)]
+            if not self._kernel32.GetProcessTimes(h, *(self._ctypes.byref(t) for t in times)):
+                return pid
+            created = times[0]
+            return pid, created.dwHighDateTime << 32 | created.dwLowDateTime
+        finally:
+            self._kernel32.CloseHandle(h)
+
+    def process_name(self, pid: int) -> str:
+        h = self._kernel32.OpenProcess(self._PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not h:
+            return ""
+        try:
+            buf = self._ctypes.create_unicode_buffer(260)
+            size = self._wintypes.DWORD(len(buf))
+            if not self._kernel32.QueryFullProcessImageNameW(h, 0, buf, self._ctypes.byref(size)):
+                return ""
+            return os.path.basename(buf.value)
+        finally:
+            self._kernel32.CloseHandle(h)
+
+
+def default_provider() -> ForegroundProvider:
+    if sys.platform == "win32":
+        return WindowsForegroundProvider()
+    return NullForegroundProvider()
+
+
+class ForegroundWatcher(QtCore.QObject):
+    """
+    Pollaa etualan prosessia (QTimer, oletuksena FOREGROUND_POLL_MS välein)
+    ja lähettää profileChanged(nimi), kun aktiivinen profiili vaihtuu.
+    Tyhjä nimi = oletusprofiili (settings.jsonin "keys").
+    """
+    profileChanged = QtCore.pyqtSignal(str)
+
+    def __init__(self, provider=None, interval_ms=FOREGROUND_POLL_MS, parent=None):
+        super().__init__(parent)
+        self.provider = provider or default_provider()
+        self._names = set()
+        self._cache = {}
+        self._last_pid = None
+        self._profile = ""
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.poll)
+
+    def setProfiles(self, names):
+        """Profiilien nimet ovat prosessinimiä, esim. 'obs64.exe'."""
+        self._names = {n.strip().lower() for n in names if n.strip()}
+        self._cache.clear()
+        self._last_pid = None
+
+    def start(self):
+        self.poll()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+
+    def currentProfile(self) -> str:
+        return self._profile
+
+    @QtCore.pyqtSlot()
+    def poll(self):
+        pid = self.provider.foreground_pid()
+        if pid == self._last_pid:
+            return
+        self._last_pid = pid
+
+        # avain sisältää käynnistysajan → kierrätetty pid ei peri vanhaa profiilia
+        key = self.provider.process_key(pid)
+        profile = self._cache.get(key)
+        if profile is None:
+            name = (self.provider.process_name(pid) or "").lower()
+            profile = name if name in self._names else ""
+            if len(self._cache) >= _CACHE_MAX:
+                self._cache.clear()
+            self._cache[key] = profile
+
+        if profile != self._profile:
+            self._profile = profile
+            self.profileChanged.emit(profile)
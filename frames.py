@@ -0,0 +1,261 @@
+# frames.py
+
+import io
+from array import array
+
+# Frame: "b0,b1,...,b5,pot0,...\r\n", napit aina yksi numero (0/1).
+# Nappiosa "0,1,0,0,1,0" luetaan yhtenä kokonaislukuna; ero nollarivistä
+# "0,0,0,0,0,0" on bitti jokaisen painetun napin kohdalla, joten sama
+# sanakirjahaku sekä tarkistaa muodon että antaa bittimaskin.
+
+
+class FrameReader:
+    """
+    Lukee sarjaportista kaiken odottavan yhdellä readinto()-kutsulla
+    uudelleenkäytettävään puskuriin ja purkaa kaikki valmiit framet kerralla.
+
+    Tulokset jäävät esivarattuihin taulukoihin:
+      masks[0:count]  — jokaisen framen nappien bittimaski (bitti i = nappi i)
+      pots[0:npots]   — uusimman ehjän potikkakentän sisältävän framen arvot
+                        (vanhemmat ovat vanhentuneita); pot_frame = sen framen indeksi
+                        masksissa, -1 jos yhdessäkään framessa ei ollut ehjiä arvoja.
+                        Rikkinäinen kenttä (esim. "…,xx") ei hylkää aiempaa ehjää.
+      stale_pots      — potikkakentälliset framet ennen pot_framea (ohitetut arvot)
+    Kesken jäänyt frame siirretään puskurin alkuun ja jatketaan seuraavalla lukukerralla.
+
+    Hyöty readline()-polkuun tulee vain, kun lukukerralla odottaa kokonaisia
+    frameja (jono kasvanut tai nopea linja, satoja frameja/s). BAUDRATE 9600:lla
+    tavut tulevat ~1 ms välein ja luku etenee tavu kerrallaan; silloin tämä on
+    CPU:lla framea kohden hitaampi kuin readline (ks. python frames.py).
+    """
+
+    def __init__(self, num_buttons=6, max_pots=8, size=4096):
+        self.num_buttons = num_buttons
+        self.buf = bytearray(size)
+        self.view = memoryview(self.buf)
+        self.fill = 0
+        self._scan = 0  # tästä eteenpäin ei ole vielä etsitty rivinvaihtoa
+
+        max_frames = size // (2 * num_buttons) + 1
+        self.masks = array("H", bytes(2 * max_frames))
+        # potikkakenttien sijainnit (alku, loppu, framen indeksi) tällä lukukerralla
+        self._pot_s = array("i", bytes(4 * max_frames))
+        self._pot_e = array("i", bytes(4 * max_frames))
+        self._pot_at = array("i", bytes(4 * max_frames))
+        self.count = 0
+        self.pots = array("H", bytes(2 * max_pots))
+        self.npots = 0
+        self.pot_frame = -1
+        self.stale_pots = 0
+        self.last_read = 0
+
+        self._btn_len = 2 * num_buttons - 1
+        self._zero = int.from_bytes(b",".join([b"0"] * num_buttons), "little")
+        self._mask_of = {}
+        for m in range(1 << num_buttons):
+            diff = sum(1 << (16 * j) for j in range(num_buttons) if m >> j & 1)
+            self._mask_of[diff] = m
+
+    def reset(self):
+        self.fill = self._scan = self.count = self.npots = self.stale_pots = 0
+        self.pot_frame = -1
+
+    def read_from(self, ser) -> int:
+        """
+        Yksi lukukerta: blokkaa enintään portin timeoutin verran, jos mitään
+        ei odota. Palauttaa valmiiden framejen määrän (masks[0:count]).
+        """
+        free = len(self.buf) - self.fill
+        if not free:
+            # puskuri täynnä ilman rivinvaihtoa → roskaa, aloitetaan alusta
+            self.fill = self._scan = 0
+            free = len(self.buf)
+        want = min(ser.in_waiting or 1, free)
+        n = ser.readinto(self.view[self.fill:self.fill + want])
+        self.last_read = n or 0
+        if not n:
+            self.count = 0
+            return 0
+        self.fill += n
+        return self.parse()
+
+    def parse(self) -> int:
+        buf, fill = self.buf, self.fill
+        masks, mask_of, zero = self.masks, self._mask_of, self._zero
+        pot_s, pot_e, pot_at = self._pot_s, self._pot_e, self._pot_at
+        blen = self._btn_len
+        count = with_pots = 0
+        s = 0
+
+        e = buf.find(10, self._scan, fill)
+        while e >= 0:
+            end = e - 1 if e > s and buf[e - 1] == 13 else e
+            if end - s >= blen and (end - s == blen or buf[s + blen] == 44):
+                m = mask_of.get(int.from_bytes(buf[s:s + blen], "little") - zero)
+                if m is not None:
+                    # potikkakenttä vain jos nappien jälkeen on muutakin kuin pilkku
+                    if end - s > blen + 1:
+                        pot_s[with_pots] = s + blen + 1
+                        pot_e[with_pots] = end
+                        pot_at[with_pots] = count
+                        with_pots += 1
+                    masks[count] = m
+                    count += 1
+            s = e + 1
+            e = buf.find(10, s, fill)
+
+        # uusimmasta vanhimpaan, kunnes kenttä jäsentyy kokonaan
+        k = with_pots - 1
+        while k >= 0 and not self._parse_pots(pot_s[k], pot_e[k]):
+            k -= 1
+        if k >= 0:
+            self.pot_frame, self.stale_pots = pot_at[k], k
+        else:
+            self.npots, self.pot_frame, self.stale_pots = 0, -1, 0
+
+        # kesken jäänyt frame puskurin alkuun
+        if s:
+            rest = fill - s
+            buf[:rest] = buf[s:fill]
+            self.fill = rest
+        self._scan = self.fill
+        self.count = count
+        return count
+
+    def _parse_pots(self, s, end) -> bool:
+        """Jäsentää kentän pots-taulukkoon. False = kentässä oli roskaa."""
+        buf, pots = self.buf, self.pots
+        n = 0
+        while s < end and n < len(pots):
+            c = buf.find(44, s, end)
+            if c < 0:
+                c = end
+            if c > s:
+                try:
+                    pots[n] = int(buf[s:c])
+                    n += 1
+                except (ValueError, OverflowError):
+                    return False
+            s = c + 1
+        self.npots = n
+        return n > 0
+
+
+# --- Benchmark: python frames.py ---
+
+class _FakeSerial(io.RawIOBase):
+    """
+    Syöttää valmiin tavuvirran kuten pyserial: in_waiting + readinto, ja
+    readline() tulee io.IOBasesta, joka lukee tavu kerrallaan read(1):llä
+    (oikeassa portissa jokainen read(1) on lisäksi select+read -syscall).
+
+    frames_per_read = 0 mallintaa hidasta linjaa (BAUDRATE 9600 ≈ 1 tavu/ms):
+    jäsennys kestää mikrosekunteja, joten lukukertojen välissä ehtii saapua
+    korkeintaan tavu, ja read_from() lukee tavun kerrallaan.
+    """
+
+    def __init__(self, data: bytes, ends, frames_per_read: int):
+        self.data = data
+        self.pos = 0
+        self.ends = ends  # framejen loppukohdat
+        self.step = frames_per_read  # montako framea "saapuu" lukukertojen välissä
+        self.frame = 0
+
+    def readable(self):
+        return True
+
+    @property
+    def in_waiting(self):
+        if not self.step:
+            return 0  # → read_from() blokkaa yhden tavun verran
+        while self.frame < len(self.ends) and self.ends[self.frame] <= self.pos:
+            self.frame += 1
+        i = min(self.frame + self.step - 1, len(self.ends) - 1)
+        return self.ends[i] - self.pos
+
+    def readinto(self, b):
+        n = min(len(b), len(self.data) - self.pos)
+        b[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+
+# emit = dataReceived.emit: jonotettu signaali pitää listat elossa kunnes
+# GUI-säie ehtii käsitellä ne. CPythonin GC käynnistyy elossa olevien
+# säiliöiden kasvusta, joten GC-paine mitataan GUI-jumissa: jono tyhjenee
+# vasta kun siihen on kertynyt _GUI_STALL signaalia.
+_GUI_STALL = 500
+
+def _legacy(ser, frames, emit):
+    # vanha polku: readline + decode + replace + split + int()-listat, emit joka framelle
+    for _ in range(frames):
+        raw = ser.readline().decode(errors="ignore").strip()
+        parts = raw.replace('\r','').replace('\n','').split(',')
+        btns = [int(x) for x in parts[:6]]
+        pots = [int(x) for x in parts[6:]] if len(parts)>6 else []
+        emit((btns, pots))
+
+
+def _chunked(ser, frames, emit):
+    # uusi polku: FrameReader + SerialWorker._emit_state (emit vain muutoksista)
+    reader = FrameReader()
+    shown = None
+    done = 0
+    while done < frames:
+        count = reader.read_from(ser)
+        done += count
+        if not count:
+            continue
+        masks = reader.masks
+        for j in range(count):
+            m = masks[j]
+        state = (masks[count - 1], reader.pots[0] if reader.npots else -1, reader.npots)
+        if state != shown:
+            shown = state
+            emit(([m >> i & 1 for i in range(6)], reader.pots[:reader.npots].tolist()))
+
+
+def _bench():
+    import gc, random, time
+    frames = 100_000
+    rnd = random.Random(1)
+    # napit vaihtuvat harvoin, potikka kohisee ±1 ja välillä liikkuu
+    lines, btns, pot = [], [0] * 6, 512
+    for _ in range(frames):
+        if rnd.random() < 0.02:
+            btns[rnd.randrange(6)] ^= 1
+        pot = max(0, min(1023, pot + (rnd.choice((-1, 0, 0, 1)) if rnd.random() < 0.9
+                                      else rnd.randrange(-40, 41))))
+        lines.append((",".join(map(str, btns)) + f",{pot}\r\n").encode())
+    data = b"".join(lines)
+    ends, pos = [], 0
+    for line in lines:
+        pos += len(line)
+        ends.append(pos)
+
+    print(f"{frames} frames, {len(data) / frames:.1f} B/frame, GUI stall {_GUI_STALL} signals")
+    print(f"  {'':13s}  {'':15s} {'CPU/frame':>10s} {'emits':>7s} {'GC gen0/1/2':>14s}")
+    for frames_per_read in (0, 1, 4):
+        label = f"{frames_per_read} frame/read" if frames_per_read else "9600 baud   "
+        for name, fn in (("readline+split", _legacy), ("chunked", _chunked)):
+            gui, emits = [], [0]
+            def emit(item):
+                emits[0] += 1
+                gui.append(item)
+                if len(gui) >= _GUI_STALL:
+                    gui.clear()
+
+            gc.collect()
+            before = [s["collections"] for s in gc.get_stats()]
+            ser = _FakeSerial(data, ends, frames_per_read)
+            t = time.process_time()
+            fn(ser, frames, emit)
+            cpu = time.process_time() - t
+            gcs = "/".join(str(s["collections"] - b) for s, b in zip(gc.get_stats(), before))
+
+            print(f"  {label}  {name:15s} {cpu / frames * 1e6:7.2f} us"
+                  f" {emits[0]:7d} {gcs:>14s}")
+
+
+if __name__ == "__main__":
+    _bench()
@@ -0,0 +1,82 @@
+# keymap.py
+
+from pynput.keyboard import Key
+from config import KEY_COMBO_SEPARATOR
+
+# tavalliset erikoisnäppäimet
+_SPECIALS = {
+    "space": Key.space, "enter": Key.enter, "return": Key.enter,
+    "esc": Key.esc, "escape": Key.esc, "tab": Key.tab,
+    "backspace": Key.backspace, "delete": Key.delete, "del": Key.delete,
+    "home": Key.home, "end": Key.end,
+    "pageup": Key.page_up, "pagedown": Key.page_down,
+    "up": Key.up, "down": Key.down, "left": Key.left, "right": Key.right,
+    "shift": Key.shift, "ctrl": Key.ctrl, "control": Key.ctrl,
+    "alt": Key.alt, "cmd": Key.cmd, "win": Key.cmd, "super": Key.cmd,
+}
+for i in range(1, 25):
+    if hasattr(Key, f"f{i}"):  # F21–F24 vain osassa pynputin backendeistä
+        _SPECIALS[f"f{i}"] = getattr(Key, f"f{i}")
+
+# Fn+Fx → consumer-toiminnot
+_FN_ACTIONS = {
+    "f5": Key.media_previous,      # Fn+F5 → edellinen biisi
+    "f6": Key.media_next,          # Fn+F6 → seuraava biisi
+    "f7": Key.media_play_pause,    # Fn+F7 → play/pause
+    "f8": Key.media_volume_mute,   # Fn+F8 → mute
+    "f9": Key.media_volume_down,   # Fn+F9 → vol down
+    "f10": Key.media_volume_up,    # Fn+F10 → vol up
+    "f11": Key.media_previous,     # (voi halutessasi muuttaa)
+    "f12": Key.media_next,         # (voi halutessasi muuttaa)
+}
+
+def parse_combo(combo: str):
+    """
+    Palauttaa (modifiers, mains).
+    Jos combo on täsmälleen 'fn+Fx' ja Fx löytyy _FN_ACTIONS:sta,
+    palautetaan mains=[consumer_key] ja modifiers=[].
+    Kaikki muut 'fn' ohitetaan ja käsittely jatkuu normaaliin tapaan.
+    """
+    if not combo:
+        return [], []
+
+    parts = [p.strip().lower() for p in combo.split(KEY_COMBO_SEPARATOR) if p.strip()]
+
+    # 1) tarkka Fn+Fx-tilanne
+    if len(parts) == 2 and parts[0] == "fn" and parts[1] in _FN_ACTIONS:
+        return [], [_FN_ACTIONS[parts[1]]]
+
+    # 2) muut, jätetään fn pois ja jatketaan
+    modifiers, mains = [], []
+    for p in parts:
+        if p == "fn":
+            continue
+        if p in ("ctrl", "control", "shift", "alt", "cmd", "win", "super"):
+            modifiers.append(_SPECIALS[p])
+        else:
+            mains.append(_SPECIALS.get(p, p))
+    return modifiers, mains
+
+def compile_action(combo: str):
+    """
+    Esikääntää yhden napin toiminnon muotoon (mods, mains, is_fn),
+    jottei comboa tarvitse jäsentää joka painalluksella.
+    Tyhjä combo → None.
+    """
+    mods, mains = parse_combo((combo or "").strip())
+    if not mods and not mains:
+        return None
+    is_fn = not mods and mains[0] in _FN_ACTIONS.values()
+    return tuple(mods), tuple(mains), is_fn
+
+def compile_table(keys, default=None):
+    """
+    Toimintotaulu: yksi esikäännetty toiminto per nappi.
+    Profiilin puuttuvat tai tyhjät kohdat otetaan oletustaulusta.
+    """
+    if default is None:
+        return tuple(compile_action(k) for k in keys)
+    return tuple(
+        compile_action(keys[i]) if i < len(keys) and keys[i] else action
+        for i, action in enumerate(default)
+    )
@@ -2,13 +2,21 @@ import sys
 from PyQt5 import QtWidgets
 from mainwindow import MainWindow
 from worker import SerialWorker
+from foreground import ForegroundWatcher
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
     worker = SerialWorker()
+    # MainWindow kytkee dataReceived- ja startWorkerReq-signaalit itse
     window = MainWindow(worker,num_buttons=6)
-    worker.dataReceived.connect(window.updateIndicators)
-    window.startWorkerReq.connect(worker.start)
+
+    # sovellusprofiilit etualan ikkunan mukaan
+    watcher = ForegroundWatcher()
+    watcher.setProfiles(window.profiles)
+    watcher.profileChanged.connect(worker.setProfile)
+    watcher.profileChanged.connect(window.showProfile)
+    watcher.start()
+
     window.show()
     sys.exit(app.exec_())
 
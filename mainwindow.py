@@ -154,6 +154,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.worker = worker
         self.num_buttons = num_buttons
         self._connected = False
+        self.profiles = {}
 
         self.setWindowTitle("⚡ CyberDeck — Black Neon Edition")
         self.setMinimumSize(1280,800)
@@ -161,6 +162,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self._make_ui()
         self._apply_neon_theme()
         self._load_settings()
+        self.worker.setProfiles(self.profiles)
 
         self.worker.dataReceived.connect(self.updateIndicators)
         self.startWorkerReq.connect(self.worker.start)
@@ -293,6 +295,10 @@ class MainWindow(QtWidgets.QMainWindow):
         else:
             self.telemetryLabel.setText("—" if not self._connected else "")
 
+    @QtCore.pyqtSlot(str)
+    def showProfile(self,name):
+        self.setStatus(f"Profile: {name}" if name else "Profile: default")
+
         
    
     # --- SETTINGS ---
@@ -315,6 +321,8 @@ class MainWindow(QtWidgets.QMainWindow):
     def _save_settings(self):
         data = {"port":self.portCombo.currentText(),
                 "keys":[sel.text() for sel in self.keyEdits]}
+        if self.profiles:
+            data["profiles"] = self.profiles
         try:
             SETTINGS_FILE.write_text(json.dumps(data,indent=2),encoding="utf-8")
         except Exception as e:
@@ -327,6 +335,7 @@ class MainWindow(QtWidgets.QMainWindow):
                 keys = data.get("keys",[])
                 for i,k in enumerate(keys[:self.num_buttons]):
                     self.keyEdits[i].setText(k)
+                self.profiles = data.get("profiles",{})
                 saved_port = data.get("port","")
                 if saved_port:
                     self._refresh_ports()
@@ -0,0 +1,118 @@
+# potactions.py
+
+import threading, time
+from config import (POT_COUNTS_PER_STEP, POT_DEADBAND, POT_TICK_MS,
+                    POT_MAX_STEPS_PER_TICK, POT_ACCEL)
+
+# Kiihdytyskäyrät: r = kiertonopeus / POT_ACCEL["ref_rate"] → askelkerroin
+ACCEL_CURVES = {
+    "none":   lambda r, exp: 1.0,
+    "linear": lambda r, exp: 1.0 + r,
+    "power":  lambda r, exp: 1.0 + r ** exp,
+}
+
+def accel_gain(rate: float, accel=POT_ACCEL) -> float:
+    """Askelkerroin kiertonopeudelle (ADC-lukemaa / s)."""
+    curve = ACCEL_CURVES.get(accel.get("curve", "none"), ACCEL_CURVES["none"])
+    r = rate / max(accel.get("ref_rate", 1.0), 1e-6)
+    return min(accel.get("max_gain", 1.0), curve(r, accel.get("exponent", 1.0)))
+
+
+class RelativePot:
+    """
+    Muuttaa potikan absoluuttiset lukemat suhteellisiksi askeliksi.
+    feed() kutsutaan lukijasäikeestä, take() ajastimelta; välissä on
+    vain murtolukuinen askelkertymä, joten nopea kierto ei tuota
+    näppäintä per frame vaan kertyy ja puretaan tahdissa.
+    """
+
+    def __init__(self, mode: str, max_steps=POT_MAX_STEPS_PER_TICK, accel=POT_ACCEL,
+                 max_pending=None):
+        self.mode = mode
+        self.max_steps = max_steps  # yläraja per ajastimen jakso
+        self.accel = accel
+        self._lock = threading.Lock()
+        self._anchor = None
+        self._t = 0.0
+        self._pending = 0.0
+        # oletuskatto = yksi koko kierros täydellä kertoimella → käyrää ei leikata
+        self._limit = (max_pending if max_pending is not None
+                       else 1024 / POT_COUNTS_PER_STEP * accel.get("max_gain", 1.0))
+
+    def reset(self):
+        with self._lock:
+            self._anchor = None
+            self._pending = 0.0
+
+    def feed(self, value: int, now: float):
+        if self._anchor is None:
+            self._anchor, self._t = value, now
+            return
+        delta = value - self._anchor
+        if abs(delta) < POT_DEADBAND:
+            return
+
+        rate = abs(delta) / max(now - self._t, 1e-3)
+        steps = delta / POT_COUNTS_PER_STEP * accel_gain(rate, self.accel)
+        self._anchor, self._t = value, now
+
+        with self._lock:
+            # katto: pysähtynyt kierto ei saa "jatkaa pyörimistä" sekunteja
+            self._pending = max(-self._limit, min(self._limit, self._pending + steps))
+
+    def take(self, max_steps: int) -> int:
+        """Palauttaa kokonaiset askeleet (etumerkillinen), enintään max_steps."""
+        with self._lock:
+            n = int(self._pending)
+            if not n:
+                return 0
+            n = max(-max_steps, min(max_steps, n))
+            self._pending -= n
+            return n
+
+
+class PotScheduler:
+    """
+    Yksi säie, joka POT_TICK_MS välein purkaa kaikkien suhteellisten
+    potikoiden kertymät ja kutsuu emit(mode, askeleet). Enintään
+    pot.max_steps askelta per jakso → OS:n syötejono ei tulvi.
+    """
+
+    def __init__(self, emit, tick_ms=POT_TICK_MS):
+        self.emit = emit
+        self.pots = []
+        self.tick = tick_ms / 1000
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.stop()
+        for pot in self.pots:
+            pot.reset()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _run(self):
+        next_t = time.perf_counter()
+        while not self._stop.is_set():
+            for pot in self.pots:
+                n = pot.take(pot.max_steps)
+                if n:
+                    try:
+                        self.emit(pot.mode, n)
+                    except Exception as e:
+                        print("Pot action error:", e)
+            next_t += self.tick
+            delay = next_t - time.perf_counter()
+            if delay < 0:
+                # jäätiin jälkeen → ei yritetä kuroa jaksoja kiinni
+                next_t = time.perf_counter()
+                delay = 0
+            self._stop.wait(delay)
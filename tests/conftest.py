@@ -0,0 +1,7 @@
+import os, sys
+
+# Moduulit ovat repon juuressa (ei pakettia)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pynput ilman näyttöä (CI / Linux)
+os.environ.setdefault("PYNPUT_BACKEND", "dummy")
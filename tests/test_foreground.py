@@ -0,0 +1,61 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from foreground import FakeForegroundProvider, ForegroundWatcher
+
+
+def make_watcher(processes, profiles):
+    provider = FakeForegroundProvider(processes)
+    watcher = ForegroundWatcher(provider)
+    watcher.setProfiles(profiles)
+    changes = []
+    watcher.profileChanged.connect(changes.append)
+    return provider, watcher, changes
+
+
+def test_known_pid_uses_cache():
+    provider, watcher, _ = make_watcher({10: "obs64.exe", 20: "Code.exe"}, ["obs64.exe"])
+
+    provider.focus(10); watcher.poll()
+    provider.focus(20); watcher.poll()
+    assert provider.name_lookups == 2
+
+    provider.focus(10); watcher.poll()
+    provider.focus(20); watcher.poll()
+    assert provider.name_lookups == 2
+    assert watcher.currentProfile() == ""
+
+
+def test_reused_pid_is_resolved_again():
+    provider, watcher, changes = make_watcher({10: "obs64.exe", 20: "explorer.exe"}, ["obs64.exe"])
+
+    provider.focus(10); watcher.poll()
+    provider.focus(20); watcher.poll()
+    provider.spawn(10, "game.exe")  # obs suljettiin, pid kierrätettiin
+    provider.focus(10); watcher.poll()
+
+    assert provider.name_lookups == 3
+    assert changes == ["obs64.exe", ""]
+
+
+def test_profile_changed_only_on_real_change():
+    provider, watcher, changes = make_watcher(
+        {10: "obs64.exe", 11: "obs64.exe", 20: "notepad.exe", 21: "explorer.exe"}, ["OBS64.exe"])
+
+    for pid in (20, 21, 10, 10, 11, 20, 21):
+        provider.focus(pid)
+        watcher.poll()
+
+    assert changes == ["obs64.exe", ""]
+
+
+def test_set_profiles_clears_cache():
+    provider, watcher, changes = make_watcher({10: "code.exe"}, [])
+
+    provider.focus(10); watcher.poll()
+    assert changes == []
+
+    watcher.setProfiles(["code.exe"])
+    watcher.poll()
+    assert changes == ["code.exe"]
@@ -0,0 +1,56 @@
+from frames import FrameReader
+
+
+class ChunkSerial:
+    """Palauttaa annetut palat yksi kerrallaan (in_waiting + readinto)."""
+
+    def __init__(self, *chunks):
+        self.chunks = list(chunks)
+
+    @property
+    def in_waiting(self):
+        return len(self.chunks[0]) if self.chunks else 0
+
+    def readinto(self, b):
+        data = self.chunks.pop(0) if self.chunks else b""
+        b[:len(data)] = data
+        return len(data)
+
+
+def read_all(reader, ser):
+    out = []
+    while ser.chunks:
+        n = reader.read_from(ser)
+        out.append((list(reader.masks[:n]), list(reader.pots[:reader.npots]), reader.pot_frame))
+    return out
+
+
+def test_frames_split_across_reads():
+    reader = FrameReader()
+    ser = ChunkSerial(b"1,0,0,0,0,1,10", b"23\r\n0,1,0,0,0,0,5\r\n")
+    assert read_all(reader, ser) == [([], [], -1), ([33, 2], [5], 1)]
+
+
+def test_garbage_and_bad_button_fields_are_skipped():
+    reader = FrameReader()
+    ser = ChunkSerial(b"garbage\n2,0,0,0,0,0,1\n0,,0,0,0,0,0\n0,0,1,0,0,0,7,8\n")
+    assert read_all(reader, ser) == [([4], [7, 8], 0)]
+
+
+def test_newest_pot_value_survives_frame_without_pots():
+    reader = FrameReader()
+    ser = ChunkSerial(b"0,1,0,0,0,0,513\r\n0,0,0,0,0,0\r\n0,0,0,0,0,1,\r\n")
+    assert read_all(reader, ser) == [([2, 0, 32], [513], 0)]
+
+
+def test_malformed_newest_pot_field_keeps_earlier_value():
+    reader = FrameReader()
+    ser = ChunkSerial(b"0,0,0,0,0,0,400\r\n0,0,0,0,0,0,401\r\n0,0,0,0,0,0,xx\r\n")
+    assert read_all(reader, ser) == [([0, 0, 0], [401], 1)]
+    assert reader.stale_pots == 1
+
+
+def test_no_pots_in_read():
+    reader = FrameReader()
+    ser = ChunkSerial(b"0,0,0,0,0,0,9\n", b"1,0,0,0,0,0\n")
+    assert read_all(reader, ser) == [([0], [9], 0), ([1], [], -1)]
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("pynput")
+
+from pynput.keyboard import Key
+from keymap import compile_action, compile_table
+
+
+def test_compile_action():
+    assert compile_action("") is None
+    assert compile_action("ctrl+shift+s") == ((Key.ctrl, Key.shift), ("s",), False)
+    assert compile_action("fn+f7") == ((), (Key.media_play_pause,), True)
+
+
+def test_profile_falls_back_to_default_keys():
+    default = compile_table(["a", "b", "c", "", "fn+f5", "f1"])
+    table = compile_table(["x", "", None, "ctrl+d"], default)
+
+    assert len(table) == len(default)
+    assert table[0] == compile_action("x")
+    assert table[1] == default[1]      # tyhjä → oletus
+    assert table[2] == default[2]      # None → oletus
+    assert table[3] == compile_action("ctrl+d")
+    assert table[3] != default[3]
+    assert table[4:] == default[4:]    # puuttuvat → oletus
+
+
+def test_profile_longer_than_default_is_truncated():
+    default = compile_table(["a", "b"])
+    assert compile_table(["x", "y", "z"], default) == (compile_action("x"), compile_action("y"))
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from config import POT_COUNTS_PER_STEP, POT_DEADBAND
+from potactions import accel_gain, RelativePot, PotScheduler
+
+
+def curve(name, max_gain=6.0):
+    return {"curve": name, "ref_rate": 400.0, "exponent": 1.5, "max_gain": max_gain}
+
+
+def test_accel_curves():
+    assert accel_gain(4000, curve("none")) == 1.0
+    assert accel_gain(400, curve("linear")) == 2.0
+    assert accel_gain(100, curve("power")) == pytest.approx(1.125)
+    assert accel_gain(400, curve("power")) == 2.0
+
+
+def test_accel_gain_is_clamped_to_max_gain():
+    assert accel_gain(1600, curve("power")) == 6.0        # 1 + 4^1.5 = 9
+    assert accel_gain(40000, curve("linear", 3.0)) == 3.0
+
+
+def test_noise_below_deadband_gives_no_steps():
+    pot = RelativePot("arrows")
+    pot.feed(512, 0.0)
+    for i in range(100):
+        pot.feed(512 + (i % POT_DEADBAND), i * 0.01)
+    assert pot.take(100) == 0
+
+
+def test_slow_sweep_gives_one_step_per_count_block():
+    pot = RelativePot("arrows", accel=curve("none"))
+    pot.feed(0, 0.0)
+    total = 0
+    for i in range(1, 81):
+        pot.feed(i * 4, i * 0.1)        # 40 lukemaa/s
+        total += pot.take(100)
+    assert total == 320 // POT_COUNTS_PER_STEP
+
+
+def test_fast_sweep_is_clamped_to_limit():
+    pot = RelativePot("arrows", max_pending=50)
+    pot.feed(0, 0.0)
+    pot.feed(1023, 0.05)
+    assert pot.take(1000) == 50
+    assert pot.take(1000) == 0
+
+    # oletuskatto = koko kierros täydellä kertoimella → nopea kierto ei leikkaudu
+    pot = RelativePot("scroll", accel=curve("power"))
+    pot.feed(0, 0.0)
+    pot.feed(1023, 0.05)
+    assert pot.take(1000) == int(1023 / POT_COUNTS_PER_STEP * 6.0)
+
+
+def test_take_respects_cap_and_keeps_sign_on_reversal():
+    pot = RelativePot("arrows", accel=curve("none"))
+    pot.feed(0, 0.0)
+    pot.feed(160, 1.0)                  # +10
+    assert [pot.take(4) for _ in range(2)] == [4, 4]
+    pot.feed(0, 2.0)                    # 2 - 10 = -8
+    assert [pot.take(3) for _ in range(4)] == [-3, -3, -2, 0]
+
+
+def test_scheduler_emits_at_most_max_steps_per_tick():
+    emitted = []
+    sched = PotScheduler(lambda mode, n: emitted.append((mode, n)), tick_ms=1)
+    pot = RelativePot("arrows", max_steps=3, accel=curve("none"))
+    sched.pots = [pot]
+    sched.start()                       # start() nollaa kertymät
+    try:
+        pot.feed(0, 0.0)
+        pot.feed(320, 10.0)             # +20
+        deadline = time.monotonic() + 2
+        while sum(n for _, n in emitted) < 20 and time.monotonic() < deadline:
+            time.sleep(0.005)
+    finally:
+        sched.stop()
+
+    assert sum(n for _, n in emitted) == 20
+    assert all(mode == "arrows" and 0 < n <= 3 for mode, n in emitted)
@@ -0,0 +1,44 @@
+import threading
+
+from usagelog import UsageLog, NO_POT, read_records, summarize
+
+
+def make_log(tmp_path, records=100):
+    log = UsageLog(tmp_path / "usage.log", 32 + 24 * records)
+    log.claim()
+    return log
+
+
+def test_ring_wraps_and_keeps_newest(tmp_path):
+    log = make_log(tmp_path, 10)
+    for i in range(25):
+        log.append(float(i), 0, 0, 0, i, 0.0)
+    log.close()
+
+    pots = [r[4] for r in read_records(tmp_path / "usage.log")]
+    assert pots == list(range(16, 25))   # vanhin paikka ohitetaan (voi olla kesken)
+
+
+def test_only_claiming_thread_writes(tmp_path):
+    log = make_log(tmp_path)
+    log.append(1.0, 1, 0, 1, NO_POT, 0.0)
+    t = threading.Thread(target=log.append, args=(2.0, 0, 1, 0, NO_POT, 0.0))
+    t.start(); t.join()
+    assert log.head == 1
+    log.close()
+
+
+def test_bounce_not_counted_within_one_read(tmp_path):
+    log = make_log(tmp_path)
+    # sama lukukerta (jonon purku): vapautus + painallus samalla aikaleimalla
+    log.append(10.0, 1, 0, 1, NO_POT, 0.001)
+    log.append(10.5, 0, 1, 0, NO_POT, 0.001)
+    log.append(10.5, 1, 0, 1, NO_POT, 0.001)
+    # eri lukukerrat 10 ms välein → värähtely
+    log.append(11.0, 0, 1, 0, NO_POT, 0.001)
+    log.append(11.01, 1, 0, 1, NO_POT, 0.001)
+    log.close()
+
+    s = summarize(read_records(tmp_path / "usage.log"))
+    assert s["presses"][0] == 3
+    assert s["bounce_rate"][0] == 1 / 3
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("serial")
+pytest.importorskip("pynput")
+
+import worker
+from frames import FrameReader
+
+
+class FakeVolume:
+    def __init__(self):
+        self.levels = []
+
+    def SetMasterVolumeLevelScalar(self, v, ctx):
+        self.levels.append(v)
+
+
+class FakeKeyboard:
+    def __init__(self):
+        self.events = []
+
+    def press(self, k):
+        self.events.append(("press", k))
+
+    def release(self, k):
+        self.events.append(("release", k))
+
+
+class OneRead:
+    def __init__(self, data):
+        self.data = data
+
+    @property
+    def in_waiting(self):
+        return len(self.data)
+
+    def readinto(self, b):
+        data, self.data = self.data, b""
+        b[:len(data)] = data
+        return len(data)
+
+
+@pytest.fixture
+def deck(monkeypatch):
+    monkeypatch.setattr(worker, "_master_volume", FakeVolume)
+    monkeypatch.setattr(worker, "USAGE_LOG_SIZE", 0)
+    monkeypatch.setattr(worker, "POT_MODES", ["volume"])
+    w = worker.SerialWorker()
+    w.keyboard = FakeKeyboard()
+    w.keys = ["a", "", "", "", "", ""]
+    w._held = [None] * 6
+    w._rebuild_tables()
+    return w
+
+
+def test_backlog_replays_every_edge_and_newest_pot(deck):
+    reader = FrameReader()
+    count = reader.read_from(OneRead(b"1,0,0,0,0,0,100\r\n0,0,0,0,0,0,200\r\n"
+                                     b"1,0,0,0,0,0,300\r\n1,0,0,0,0,0\r\n"))
+    assert count == 4
+    deck._handle_read(reader, count)
+
+    # press / release / press, viimeisessä framessa ei muutosta eikä potikkaa
+    assert deck.keyboard.events == [("press", "a"), ("release", "a"), ("press", "a")]
+    assert deck.volume.levels == [300 / 1023]
+    assert deck.metrics["collapsed_frames"] == 2
+    assert deck.metrics["catchups"] == 1
+
+
+def test_normal_jitter_is_not_a_catchup(deck):
+    reader = FrameReader()
+    count = reader.read_from(OneRead(b"0,0,0,0,0,0,5\r\n0,0,0,0,0,0,6\r\n"))
+    deck._handle_read(reader, count)
+
+    assert deck.volume.levels == [6 / 1023]
+    assert deck.metrics["catchups"] == 0
+    assert deck.metrics["collapsed_frames"] == 1
@@ -0,0 +1,171 @@
+# usagelog.py
+
+import mmap, os, struct, sys, threading
+from config import USAGE_LOG_FILE, USAGE_LOG_SIZE
+
+# Rengaspuskuri tiedostossa (mmap). Kirjoittaja on yksi säie (SerialWorkerin
+# lukija), joten lukkoja ei tarvita: ensin tietue, sitten head-laskuri.
+# Yksi kirjoittaja varmistetaan claim():lla: muiden säikeiden append() ohitetaan.
+# Kirjoitus on pelkkä muistikirjoitus → ei syscalleja per tapahtuma, ja
+# käyttöjärjestelmä kirjoittaa sivut levylle vaikka ohjelma kaatuisi.
+#
+# Otsake:  magic, tietueen koko, kapasiteetti, head (kirjoitettujen määrä)
+# Tietue:  aikaleima (s), painetut, vapautetut, nappimaski, potikka, viive (s)
+#          Saman lukukerran tietueilla on sama aikaleima.
+_MAGIC = b"ADECKLOG"
+_HEADER = struct.Struct("<8sIIQ")
+_HEADER_SIZE = 32
+_HEAD = struct.Struct("<Q")
+_HEAD_OFFSET = 16
+RECORD = struct.Struct("<dHHHHf4x")
+
+NO_POT = 0xFFFF
+BOUNCE_MS = 30  # painallus näin pian saman napin vapautuksen jälkeen = värähtely
+
+
+class UsageLog:
+    """Kirjoittaja: append() claim()-kutsun tehneestä säikeestä, ei lukkoja eikä syscalleja."""
+
+    def __init__(self, path=USAGE_LOG_FILE, size=USAGE_LOG_SIZE):
+        self.capacity = max(1, (size - _HEADER_SIZE) // RECORD.size)
+        length = _HEADER_SIZE + self.capacity * RECORD.size
+
+        self._f = open(path, "r+b" if os.path.exists(path) else "w+b")
+        header = self._f.read(_HEADER.size)
+        if os.fstat(self._f.fileno()).st_size != length:
+            self._f.truncate(length)
+        self.mm = mmap.mmap(self._f.fileno(), length)
+
+        # säilytetään vanha loki (kaatumisen jäljet), jos muoto täsmää
+        if (len(header) == _HEADER.size
+                and _HEADER.unpack(header)[:3] == (_MAGIC, RECORD.size, self.capacity)):
+            self.head = _HEADER.unpack(header)[3]
+        else:
+            self.head = 0
+            _HEADER.pack_into(self.mm, 0, _MAGIC, RECORD.size, self.capacity, 0)
+        self._owner = None
+
+    def claim(self):
+        """Kutsuvasta säikeestä tulee ainoa kirjoittaja (uusi lukijasäie ottaa vuoron)."""
+        self._owner = threading.get_ident()
+
+    def append(self, t, down, up, mask, pot, latency):
+        if threading.get_ident() != self._owner:
+            return
+        RECORD.pack_into(self.mm, _HEADER_SIZE + (self.head % self.capacity) * RECORD.size,
+                         t, down, up, mask, pot, latency)
+        self.head += 1
+        _HEAD.pack_into(self.mm, _HEAD_OFFSET, self.head)
+
+    def close(self):
+        self.mm.flush()
+        self.mm.close()
+        self._f.close()
+
+
+def read_records(path=USAGE_LOG_FILE):
+    """Palauttaa tietueet vanhimmasta uusimpaan (tuple-lista)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, rsize, capacity, head = _HEADER.unpack_from(data)
+    if magic != _MAGIC or rsize != RECORD.size:
+        raise ValueError(f"{path}: not a usage log")
+
+    body = memoryview(data)[_HEADER_SIZE:_HEADER_SIZE + capacity * rsize]
+    if head <= capacity:
+        return list(RECORD.iter_unpack(body[:head * rsize]))
+    # kääntynyt: vanhin paikka voi olla kesken kirjoituksen → ohitetaan se
+    start = (head % capacity) + 1
+    return (list(RECORD.iter_unpack(body[start * rsize:]))
+            + list(RECORD.iter_unpack(body[:(start - 1) * rsize])))
+
+
+def _percentile(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(p / 100 * len(sorted_vals)))]
+
+
+def _latency_ms(vals):
+    ms = {f"p{p}": _percentile(vals, p) * 1000 for p in (50, 90, 99)}
+    ms["max"] = (vals[-1] if vals else 0.0) * 1000
+    ms["n"] = len(vals)
+    return ms
+
+
+def summarize(records, num_buttons=6):
+    """Painallukset, värähtely, potikan kohinataso ja viiveet yhdellä läpikäynnillä."""
+    presses = [0] * num_buttons
+    bounces = [0] * num_buttons
+    released_at = [None] * num_buttons
+    btn_lat, pot_lat, pot_deltas = [], [], []
+    last_pot = None
+
+    for t, down, up, mask, pot, latency in records:
+        if down or up:
+            btn_lat.append(latency)
+        elif pot != NO_POT:
+            pot_lat.append(latency)
+
+        for i in range(num_buttons):
+            bit = 1 << i
+            if down & bit:
+                presses[i] += 1
+                r = released_at[i]
+                # sama aikaleima = sama lukukerta (jonoa purettiin), framejen
+                # väliä ei tiedetä → ei lasketa värähtelyksi
+                if r is not None and r != t and (t - r) * 1000 < BOUNCE_MS:
+                    bounces[i] += 1
+            if up & bit:
+                released_at[i] = t
+
+        if pot != NO_POT:
+            if last_pot is not None and pot != last_pot:
+                pot_deltas.append(abs(pot - last_pot))
+            last_pot = pot
+
+    btn_lat.sort()
+    pot_lat.sort()
+    pot_deltas.sort()
+    return {
+        "records": len(records),
+        "span_s": records[-1][0] - records[0][0] if records else 0.0,
+        "presses": presses,
+        "bounce_rate": [b / p if p else 0.0 for b, p in zip(bounces, presses)],
+        # kohinataso: tyypillinen muutos peräkkäisten lukemien välillä
+        "pot_noise": {"samples": len(pot_deltas),
+                      "p50": _percentile(pot_deltas, 50),
+                      "p90": _percentile(pot_deltas, 90)},
+        "latency_ms": {"buttons": _latency_ms(btn_lat), "pot": _latency_ms(pot_lat)},
+    }
+
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Summarize the ArduDeck usage log.")
+    ap.add_argument("path", nargs="?", default=str(USAGE_LOG_FILE))
+    ap.add_argument("--buttons", type=int, default=6)
+    args = ap.parse_args(argv)
+
+    try:
+        s = summarize(read_records(args.path), args.buttons)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Cannot read log: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{s['records']} records over {s['span_s'] / 60:.1f} min")
+    print("\nButton  presses  bounce")
+    for i, (n, b) in enumerate(zip(s["presses"], s["bounce_rate"])):
+        print(f"BTN {i+1:<3} {n:8d}  {b:6.1%}")
+    noise = s["pot_noise"]
+    print(f"\nPot noise floor: p50 {noise['p50']} / p90 {noise['p90']} counts"
+          f" ({noise['samples']} changes)")
+    print("\nLatency (ms)     n      p50     p90     p99     max")
+    for name, lat in s["latency_ms"].items():
+        print(f"{name:10s} {lat['n']:7d} {lat['p50']:8.2f}{lat['p90']:8.2f}"
+              f"{lat['p99']:8.2f}{lat['max']:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
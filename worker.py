@@ -4,147 +4,285 @@ import threading, time
 from PyQt5 import QtCore
 import serial
 from pynput.keyboard import Controller, Key
-from config import KEY_COMBO_SEPARATOR
-
-# pycaw volume control
-from ctypes import cast, POINTER
-from comtypes import CLSCTX_ALL
-from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-
-# tavalliset erikoisnäppäimet
-_SPECIALS = {
-    "space": Key.space, "enter": Key.enter, "return": Key.enter,
-    "esc": Key.esc, "escape": Key.esc, "tab": Key.tab,
-    "backspace": Key.backspace, "delete": Key.delete, "del": Key.delete,
-    "home": Key.home, "end": Key.end,
-    "pageup": Key.page_up, "pagedown": Key.page_down,
-    "up": Key.up, "down": Key.down, "left": Key.left, "right": Key.right,
-    "shift": Key.shift, "ctrl": Key.ctrl, "control": Key.ctrl,
-    "alt": Key.alt, "cmd": Key.cmd, "win": Key.cmd, "super": Key.cmd,
-}
-for i in range(1, 25):
-    _SPECIALS[f"f{i}"] = getattr(Key, f"f{i}")
-
-# Fn+Fx → consumer-toiminnot
-_FN_ACTIONS = {
-    "f5": Key.media_previous,      # Fn+F5 → edellinen biisi
-    "f6": Key.media_next,          # Fn+F6 → seuraava biisi
-    "f7": Key.media_play_pause,    # Fn+F7 → play/pause
-    "f8": Key.media_volume_mute,   # Fn+F8 → mute
-    "f9": Key.media_volume_down,   # Fn+F9 → vol down
-    "f10": Key.media_volume_up,    # Fn+F10 → vol up
-    "f11": Key.media_previous,     # (voi halutessasi muuttaa)
-    "f12": Key.media_next,         # (voi halutessasi muuttaa)
+from pynput import mouse
+from config import (POT_MODES, POT_TICK_MS, POT_MAX_STEPS_PER_TICK, POT_MAX_SCROLL_PER_TICK,
+                    POT_KEY_TAIL_MS, USAGE_LOG_SIZE, CATCHUP_FRAMES)
+from keymap import compile_table
+from potactions import RelativePot, PotScheduler
+from frames import FrameReader
+from usagelog import UsageLog, NO_POT
+
+# potikan suhteelliset tilat: (positiivinen suunta, negatiivinen suunta)
+_POT_KEYS = {
+    "arrows": (Key.up, Key.down),
+    "scrub": (Key.right, Key.left),
+    "zoom": ("+", "-"),
 }
+# pidetään pohjassa askelten ajan
+_POT_HOLD = {"zoom": Key.ctrl}
+# näppäintilojen kertymän katto: nuppi pysähtyy → näppäimet loppuvat POT_KEY_TAIL_MS:ssa
+_POT_KEY_PENDING = POT_MAX_STEPS_PER_TICK * POT_KEY_TAIL_MS // POT_TICK_MS
 
-def _parse_combo(combo: str):
-    """
-    Palauttaa (modifiers, mains).
-    Jos combo on täsmälleen 'fn+Fx' ja Fx löytyy _FN_ACTIONS:sta,
-    palautetaan mains=[consumer_key] ja modifiers=[].
-    Kaikki muut 'fn' ohitetaan ja käsittely jatkuu normaaliin tapaan.
-    """
-    if not combo:
-        return [], []
-
-    parts = [p.strip().lower() for p in combo.split(KEY_COMBO_SEPARATOR) if p.strip()]
-
-    # 1) tarkka Fn+Fx-tilanne
-    if len(parts) == 2 and parts[0] == "fn" and parts[1] in _FN_ACTIONS:
-        return [], [_FN_ACTIONS[parts[1]]]
-
-    # 2) muut, jätetään fn pois ja jatketaan
-    modifiers, mains = [], []
-    for p in parts:
-        if p == "fn":
-            continue
-        if p in ("ctrl", "control", "shift", "alt", "cmd", "win", "super"):
-            modifiers.append(_SPECIALS[p])
-        else:
-            mains.append(_SPECIALS.get(p, p))
-    return modifiers, mains
+def _master_volume():
+    # pycaw volume control (vain Windows → tuodaan vasta tarvittaessa)
+    from ctypes import cast, POINTER
+    from comtypes import CLSCTX_ALL
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+    dev = AudioUtilities.GetSpeakers()
+    intf = dev.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+    return cast(intf, POINTER(IAudioEndpointVolume))
 
 class SerialWorker(QtCore.QObject):
     dataReceived = QtCore.pyqtSignal(list, list)
 
     def __init__(self):
         super().__init__()
-        self._running = False
         self.ser = None
+        self._thread = None
+        # ajon sukupolvi: start()/stop() kasvattavat, vanha lukijasäie lopettaa
+        # heti kun sen oma numero ei enää ole voimassa
+        self._gen = 0
         self.keys = []
         self.keyboard = Controller()
-        self._last = []
+        # napit (lukijasäie) ja potikan askeleet (PotScheduler) injektoivat
+        # vuorotellen, ettei esim. zoomin ctrl sekoitu napin näppäimiin
+        self._inject = threading.Lock()
+        self.mouse = mouse.Controller()
+        self._last = 0        # edellisen framen nappimaski
+        self._shown = None    # viimeksi GUI:lle lähetetty (maski, potikat)
+
+        # sovellusprofiilit: nimi → esikäännetty toimintotaulu ("" = oletus).
+        # Profiilin vaihto on pelkkä _actions-viittauksen vaihto.
+        self._profiles = {}
+        self._tables = {"": ()}
+        self._profile = ""
+        self._actions = ()
+        self._held = []  # painettuna olevan napin toiminto (vapautetaan samalla)
+
+        # lukijan mittarit. Worker lukee aina kaiken odottavan kerralla, joten:
+        #   backlog_bytes     – viimeisellä lukukerralla saatu tavumäärä (jonon syvyys)
+        #   backlog_max       – suurin jonon syvyys
+        #   catchups          – lukukerrat, joilla jonossa oli vähintään CATCHUP_FRAMES
+        #                       framea (host oli oikeasti jäljessä)
+        #   collapsed_frames  – potikkakentälliset framet, joiden arvo ohitettiin
+        #                       vanhentuneena (saman lukukerran uudempi arvo voitti)
+        self.metrics = {
+            "backlog_bytes": 0,
+            "backlog_max": 0,
+            "catchups": 0,
+            "collapsed_frames": 0,
+        }
 
         # volume control init
-        dev = AudioUtilities.GetSpeakers()
-        intf = dev.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-        self.volume = cast(intf, POINTER(IAudioEndpointVolume))
+        self.volume = _master_volume()
+
+        # suhteelliset potikat (scroll/arrows/...) → askeleet ajastimelta
+        self._rel_pots = {i: RelativePot(mode, POT_MAX_SCROLL_PER_TICK) if mode == "scroll"
+                             else RelativePot(mode, POT_MAX_STEPS_PER_TICK,
+                                              max_pending=_POT_KEY_PENDING)
+                          for i, mode in enumerate(POT_MODES)
+                          if mode == "scroll" or mode in _POT_KEYS}
+        self.potScheduler = PotScheduler(self._emit_pot_steps)
+        self.potScheduler.pots = list(self._rel_pots.values())
+
+        # käyttöloki (mmap-rengas), kirjoitetaan vain lukijasäikeestä
+        self.usageLog = None
+        self._logged_pot = NO_POT
+        if USAGE_LOG_SIZE:
+            try:
+                self.usageLog = UsageLog()
+            except Exception as e:
+                print("Usage log error:", e)
 
     @QtCore.pyqtSlot(str, int, list)
     def start(self, port, baudrate, keys):
-        self.stop()
-        self._running = True
+        self.stop()   # odottaa edellisen lukijasäikeen loppuun
+        gen = self._gen
         self.keys = keys
-        self._last = [0]*len(keys)
+        self._last = 0
+        self._shown = None
+        self._held = [None]*len(keys)
+        self._rebuild_tables()
         try:
             self.ser = serial.Serial(port, baudrate, timeout=1)
-            threading.Thread(target=self._run, daemon=True).start()
+            # jokaisella ajolla oma puskuri ja portti → vanha säie ei voi
+            # koskea uuden ajon jäsennystilaan
+            self._thread = threading.Thread(
+                target=self._run, args=(self.ser, FrameReader(num_buttons=6), gen), daemon=True)
+            self._thread.start()
+            if self._rel_pots:
+                self.potScheduler.start()
         except Exception as e:
             print("Serial open error:", e)
 
+    @QtCore.pyqtSlot(dict)
+    def setProfiles(self, profiles):
+        """profiles: {"obs64.exe": ["ctrl+f1", ...], ...}"""
+        self._profiles = {name.strip().lower(): list(keys)
+                          for name, keys in profiles.items() if name.strip()}
+        self._rebuild_tables()
+
+    @QtCore.pyqtSlot(str)
+    def setProfile(self, name):
+        self._profile = name
+        self._actions = self._tables.get(name) or self._tables[""]
+
+    def _rebuild_tables(self):
+        default = compile_table(self.keys)
+        tables = {"": default}
+        for name, keys in self._profiles.items():
+            tables[name] = compile_table(keys, default)
+        self._tables = tables
+        self._actions = tables.get(self._profile) or default
+
     def stop(self):
-        self._running = False
+        self._gen += 1
+        self.potScheduler.stop()
         if self.ser:
             try: self.ser.close()
             except: pass
         self.ser = None
+        # close() keskeyttää lukemisen, viimeistään portin timeout (1 s)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2)
+            if self._thread.is_alive():
+                print("Serial reader did not stop in time")
+        self._thread = None
 
-    def _run(self):
-        while self._running and self.ser:
+    def _run(self, ser, reader, gen):
+        """
+        Lukee kaiken odottavan kerralla (FrameReader) ja käsittelee sen
+        _handle_read():lla. Tämä säie on usage login ainoa kirjoittaja (claim).
+        """
+        if self.usageLog:
+            self.usageLog.claim()
+        while self._gen == gen:
             try:
-                raw = self.ser.readline().decode(errors="ignore").strip()
-                if not raw: continue
-                parts = raw.replace('\r','').replace('\n','').split(',')
-                if len(parts) < 6: continue
-
-                btns = [int(x) for x in parts[:6]]
-                pots = [int(x) for x in parts[6:]] if len(parts)>6 else []
-
-                # volume potikka
-                if pots:
-                    v = max(0.0, min(1.0, pots[0]/1023))
-                    self.volume.SetMasterVolumeLevelScalar(v, None)
-
-                # napit
-                for i, st in enumerate(btns):
-                    if i >= len(self.keys): continue
-                    combo = (self.keys[i] or "").strip()
-                    is_fn_exact = combo.lower().startswith("fn+")
-
-                    # Paina alas
-                    if st == 1 and self._last[i] == 0:
-                        mods, mains = _parse_combo(combo)
-                        if not mods and mains and mains[0] in _FN_ACTIONS.values():
-                            # Fn+Fx: yksi press+release
-                            for k in mains:
-                                self.keyboard.press(k)
-                                time.sleep(0.02)
-                                self.keyboard.release(k)
-                        else:
-                            # tavallinen mod+key alas
-                            for m in mods:  self.keyboard.press(m)
-                            for k in mains: self.keyboard.press(k)
-
-                    # Vapauta ylhäällä (skipataan Fn+Fx-tapaukset)
-                    elif st == 0 and self._last[i] == 1:
-                        mods, mains = _parse_combo(combo)
-                        if mods or mains:
-                            for k in mains:     self.keyboard.release(k)
-                            for m in reversed(mods): self.keyboard.release(m)
-
-                self._last = btns
-                self.dataReceived.emit(btns, pots)
-
+                count = reader.read_from(ser)
+                # stop() ehti väliin → tämän ajon tulokset hylätään
+                if self._gen != gen: break
+                if count:
+                    self._handle_read(reader, count)
             except Exception as e:
+                if self._gen != gen: break   # portti suljettiin stop():ssa
                 print("Serial error:", e)
                 time.sleep(0.05)
+
+    def _handle_read(self, reader, count):
+        """
+        Yhden lukukerran framet: jokaisen framen nappireunat ajetaan
+        järjestyksessä (yhtään painallusta ei menetetä), mutta potikasta
+        käytetään vain uusin arvo – vanhemmat ovat jo vanhentuneita, joten
+        jäljessä ollessa volume ei "jahtaa" nuppia.
+        """
+        # jonon syvyys = yhdellä kertaa luettu tavumäärä
+        waiting = reader.last_read
+        self.metrics["backlog_bytes"] = waiting
+        if waiting > self.metrics["backlog_max"]:
+            self.metrics["backlog_max"] = waiting
+        if count >= CATCHUP_FRAMES:
+            self.metrics["catchups"] += 1
+        self.metrics["collapsed_frames"] += reader.stale_pots
+
+        masks = reader.masks
+        pot = reader.pots[0] if reader.npots else NO_POT
+        log = self.usageLog
+        now = time.time()   # yksi aikaleima per lukukerta
+        for j in range(count):
+            mask, prev = masks[j], self._last
+            edges = mask ^ prev
+            if not edges: continue
+            t0 = time.perf_counter()
+            self._apply_buttons(mask)
+            if log:
+                # potikka-arvo vain sille framelle, jolta se on jäsennetty
+                log.append(now, mask & edges, prev & edges, mask,
+                           pot if j == reader.pot_frame else NO_POT,
+                           time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        self._apply_pots(reader.pots, reader.npots)
+        if log and pot != NO_POT and pot != self._logged_pot:
+            self._logged_pot = pot
+            log.append(now, 0, 0, mask, pot, time.perf_counter() - t0)
+
+        self._emit_state(mask, reader)
+
+    def _emit_state(self, mask, reader):
+        # GUI:lle vain muutokset → listoja ei rakenneta joka framelle
+        pots, npots = reader.pots, reader.npots
+        pot0 = pots[0] if npots else -1
+        if self._shown == (mask, pot0, npots):
+            return
+        self._shown = (mask, pot0, npots)
+        btns = [mask >> i & 1 for i in range(reader.num_buttons)]
+        self.dataReceived.emit(btns, pots[:npots].tolist())
+
+    def _apply_pots(self, pots, npots):
+        now = time.perf_counter()
+        for i in range(npots):
+            value = pots[i]
+            mode = POT_MODES[i] if i < len(POT_MODES) else "none"
+            # volume potikka
+            if mode == "volume":
+                v = max(0.0, min(1.0, value/1023))
+                self.volume.SetMasterVolumeLevelScalar(v, None)
+            elif i in self._rel_pots:
+                self._rel_pots[i].feed(value, now)
+
+    def _emit_pot_steps(self, mode, n):
+        """PotSchedulerin säikeestä: n askelta (etumerkki = suunta)."""
+        if mode == "scroll":
+            self.mouse.scroll(0, n)
+            return
+        up, down = _POT_KEYS[mode]
+        k = up if n > 0 else down
+        hold = _POT_HOLD.get(mode)
+        with self._inject:
+            # jos napin toiminto pitää jo samaa modifieria pohjassa, ei
+            # paineta eikä varsinkaan vapauteta sitä napin alta
+            if hold and any(a and hold in a[0] for a in self._held):
+                hold = None
+            if hold: self.keyboard.press(hold)
+            for _ in range(abs(n)):
+                self.keyboard.press(k)
+                self.keyboard.release(k)
+            if hold: self.keyboard.release(hold)
+
+    def _apply_buttons(self, mask):
+        edges = mask ^ self._last
+        if not edges: return
+        self._last = mask
+
+        actions = self._actions
+        with self._inject:
+            for i in range(len(actions)):
+                bit = 1 << i
+                if not edges & bit: continue
+
+                # Paina alas
+                if mask & bit:
+                    action = actions[i]
+                    if action is None: continue
+                    mods, mains, is_fn = action
+                    if is_fn:
+                        # Fn+Fx: yksi press+release
+                        for k in mains:
+                            self.keyboard.press(k)
+                            time.sleep(0.02)
+                            self.keyboard.release(k)
+                    else:
+                        # tavallinen mod+key alas
+                        for m in mods:  self.keyboard.press(m)
+                        for k in mains: self.keyboard.press(k)
+                        self._held[i] = action
+
+                # Vapauta ylhäällä (skipataan Fn+Fx-tapaukset). Vapautetaan se
+                # toiminto joka painettiin, vaikka profiili olisi välissä vaihtunut.
+                else:
+                    action = self._held[i]
+                    if action is None: continue
+                    self._held[i] = None
+                    mods, mains, _ = action
+                    for k in mains:     self.keyboard.release(k)
+                    for m in reversed(mods): self.keyboard.release(m)